@@ -1,10 +1,20 @@
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 import requests
+from concurrent.futures import ThreadPoolExecutor
 import json
 from datetime import datetime
+from functools import lru_cache
+import heapq
+import itertools
 import os
+import threading
+import time
+import zlib
 from dotenv import load_dotenv
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import orjson
+from indicators_jit import HAVE_NUMBA, compute_all_indicators
 
 
 load_dotenv()
@@ -13,214 +23,320 @@ app = Flask(__name__)
 
 API_KEY = os.getenv('ALPHA_VANTAGE_API_KEY', 'your_api_key_here')
 BASE_URL = 'https://www.alphavantage.co/query'
+CACHE_TTL_SECONDS = 60
 
-def get_stock_data(symbol, function='TIME_SERIES_DAILY'):
+# Indicator parameters; Bollinger Bands use the short SMA window
+SMA_SHORT_WINDOW = 20
+SMA_LONG_WINDOW = 50
+EMA_FAST_WINDOW = 12
+EMA_SLOW_WINDOW = 26
+MACD_SIGNAL_WINDOW = 9
+RSI_WINDOW = 14
+BOLLINGER_STD = 2
+
+# Days returned to the chart, and the history needed so every indicator is
+# defined across all of them. An indicator's first value needs this many
+# points: the window for SMAs and EMAs, slow + signal - 1 for the MACD signal,
+# and window + 2 for RSI (one delta is lost, and the seed average isn't shown).
+DISPLAY_DAYS = 30
+LONGEST_WINDOW = max(SMA_LONG_WINDOW, EMA_SLOW_WINDOW + MACD_SIGNAL_WINDOW - 1,
+                     RSI_WINDOW + 2)
+SHORTEST_WINDOW = min(SMA_SHORT_WINDOW, EMA_FAST_WINDOW, RSI_WINDOW + 2)
+HISTORY_DAYS = LONGEST_WINDOW + DISPLAY_DAYS
+MAX_WORKERS = 16
+# (connect, read) seconds; a hung upstream must not hold a shared worker forever
+REQUEST_TIMEOUT = (5, 15)
+GZIP_LEVEL = 6
+PROCESSED_CACHE_SIZE = 1024
+
+# Shared session keeps the TCP/TLS connection to Alpha Vantage alive between calls
+session = requests.Session()
+session.headers.update({'Accept-Encoding': 'gzip'})
+session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=MAX_WORKERS))
+
+# Processed chart data keyed by (symbol, last refreshed); it only changes when
+# Alpha Vantage publishes a new bar
+processed_cache = {}
+processed_cache_lock = threading.Lock()
+
+# Worker threads for overlapping Alpha Vantage calls (network I/O releases the GIL)
+executor = ThreadPoolExecutor(max_workers=MAX_WORKERS)
+
+def cache_bucket():
+    """Current cache time bucket; cached responses expire when it rolls over"""
+    return int(time.time() // CACHE_TTL_SECONDS)
+
+class RateLimitError(Exception):
+    """Alpha Vantage answered with a rate-limit 'Note' or 'Information' payload"""
+
+# Cache bucket in which Alpha Vantage last rate-limited us; no further calls
+# are sent until the bucket rolls over
+rate_limited_bucket = None
+
+@lru_cache(maxsize=512)
+def _cached_query(function, symbol, bucket, outputsize=None):
     """
-    Fetch stock data from Alpha Vantage API
+    Fetch and decode an Alpha Vantage response, memoized per time bucket.
+    HTTP errors, timeouts and rate-limit replies raise, so lru_cache never
+    stores them; other payloads (including 'Error Message' for an unknown
+    symbol) are cached for the rest of the bucket.
     """
+    global rate_limited_bucket
+    if bucket == rate_limited_bucket:
+        raise RateLimitError('Rate limited earlier in this cache bucket')
+    
     params = {
         'function': function,
         'symbol': symbol,
-        'apikey': API_KEY,
-        'outputsize': 'compact'
+        'apikey': API_KEY
     }
+    if outputsize:
+        params['outputsize'] = outputsize
+    
+    response = session.get(BASE_URL, params=params, timeout=REQUEST_TIMEOUT)
+    response.raise_for_status()
+    data = orjson.loads(response.content)
     
+    if 'Note' in data or 'Information' in data:
+        rate_limited_bucket = bucket
+        raise RateLimitError(data.get('Note') or data.get('Information'))
+    
+    return data
+
+def get_stock_data(symbol, function='TIME_SERIES_DAILY'):
+    """
+    Fetch stock data from Alpha Vantage API
+    """
     try:
-        response = requests.get(BASE_URL, params=params)
-        data = response.json()
+        data = _cached_query(function, symbol, cache_bucket(), 'compact')
         
         if 'Error Message' in data:
             return None, "Invalid stock symbol"
         
-        if 'Note' in data:
-            return None, "API call frequency limit reached. Please try again later."
-        
         return data, None
+    except RateLimitError:
+        return None, "API call frequency limit reached. Please try again later."
     except Exception as e:
         return None, f"Error fetching data: {str(e)}"
 
+@lru_cache(maxsize=128)
+def nan_series(n):
+    """Shared read-only all-NaN series for indicators too short to compute"""
+    series = np.full(n, np.nan, dtype=np.float32)
+    series.flags.writeable = False
+    return series
+
+# Per-indicator functions: build_stock_data only uses these when numba is not
+# installed (with numba, compute_all_indicators computes everything in one pass)
 def calculate_sma(prices, window):
     """Calculate Simple Moving Average"""
-    if len(prices) < window:
-        return [None] * len(prices)
+    arr = np.asarray(prices, dtype=np.float64)
+    n = len(arr)
+    if n < window:
+        return nan_series(n)
     
-    sma = []
-    for i in range(len(prices)):
-        if i < window - 1:
-            sma.append(None)
-        else:
-            sma.append(sum(prices[i-window+1:i+1]) / window)
+    sma = np.full(n, np.nan)
+    # Rolling sums from shifted prefix sums: O(n) instead of O(n*window)
+    csum = np.empty(n + 1)
+    csum[0] = 0.0
+    np.cumsum(arr, out=csum[1:])
+    sma[window-1:] = (csum[window:] - csum[:-window]) / window
     return sma
 
 def calculate_ema(prices, window):
     """Calculate Exponential Moving Average"""
-    if len(prices) < window:
-        return [None] * len(prices)
+    arr = np.asarray(prices, dtype=np.float64)
+    n = len(arr)
+    if n < window:
+        return nan_series(n)
     
-    ema = [None] * (window - 1)
+    # The recurrence is serial, so it stays a loop
+    ema = np.full(n, np.nan)
+    value = arr[:window].sum() / window  # First EMA is SMA
+    ema[window-1] = value
     multiplier = 2 / (window + 1)
-    ema.append(sum(prices[:window]) / window)  # First EMA is SMA
-    
-    for i in range(window, len(prices)):
-        ema.append((prices[i] * multiplier) + (ema[-1] * (1 - multiplier)))
+    for i in range(window, n):
+        value = (arr[i] * multiplier) + (value * (1 - multiplier))
+        ema[i] = value
     
     return ema
 
 def calculate_rsi(prices, window=14):
     """Calculate Relative Strength Index"""
-    if len(prices) < window + 1:
-        return [None] * len(prices)
+    arr = np.asarray(prices, dtype=np.float64)
+    n = len(arr)
+    if n < window + 1:
+        return nan_series(n)
     
-    deltas = [prices[i] - prices[i-1] for i in range(1, len(prices))]
-    gains = [delta if delta > 0 else 0 for delta in deltas]
-    losses = [-delta if delta < 0 else 0 for delta in deltas]
+    rsi = np.full(n, np.nan)
+    deltas = np.diff(arr)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
     
-    avg_gain = sum(gains[:window]) / window
-    avg_loss = sum(losses[:window]) / window
-    
-    rsi = [None] * window
+    avg_gain = gains[:window].sum() / window
+    avg_loss = losses[:window].sum() / window
     
+    # Wilder smoothing is serial; rsi[i + 1] lines up with deltas[i]
     for i in range(window, len(gains)):
         avg_gain = ((avg_gain * (window - 1)) + gains[i]) / window
         avg_loss = ((avg_loss * (window - 1)) + losses[i]) / window
         
         if avg_loss == 0:
-            rsi.append(100)
+            rsi[i + 1] = 100.0
         else:
             rs = avg_gain / avg_loss
-            rsi.append(100 - (100 / (1 + rs)))
+            rsi[i + 1] = 100.0 - (100.0 / (1.0 + rs))
     
-    return [None] + rsi  # Add None for first price (no delta)
+    return rsi
 
 def calculate_bollinger_bands(prices, window=20, num_std=2):
     """Calculate Bollinger Bands"""
-    if len(prices) < window:
-        return [None] * len(prices), [None] * len(prices), [None] * len(prices)
-    
-    sma = calculate_sma(prices, window)
-    upper_band = []
-    lower_band = []
+    arr = np.asarray(prices, dtype=np.float64)
+    n = len(arr)
+    if n < window:
+        return nan_series(n), nan_series(n), nan_series(n)
     
-    for i in range(len(prices)):
-        if i < window - 1:
-            upper_band.append(None)
-            lower_band.append(None)
-        else:
-            std_dev = np.std(prices[i-window+1:i+1])
-            upper_band.append(sma[i] + (num_std * std_dev))
-            lower_band.append(sma[i] - (num_std * std_dev))
+    upper_band = np.full(n, np.nan)
+    middle_band = np.full(n, np.nan)
+    lower_band = np.full(n, np.nan)
+    # One vectorized reduction over a strided (n - window + 1, window) view
+    windows = sliding_window_view(arr, window)
+    mean = windows.mean(axis=1)
+    std_dev = windows.std(axis=1)
     
-    return upper_band, sma, lower_band
+    middle_band[window-1:] = mean
+    upper_band[window-1:] = mean + num_std * std_dev
+    lower_band[window-1:] = mean - num_std * std_dev
+    return upper_band, middle_band, lower_band
 
 def calculate_macd(prices, fast=12, slow=26, signal=9):
     """Calculate MACD (Moving Average Convergence Divergence)"""
-    ema_fast = calculate_ema(prices, fast)
-    ema_slow = calculate_ema(prices, slow)
+    arr = np.asarray(prices, dtype=np.float64)
+    ema_fast = calculate_ema(arr, fast)
+    ema_slow = calculate_ema(arr, slow)
+    macd_line = ema_fast - ema_slow
     
-    macd_line = []
-    for i in range(len(prices)):
-        if ema_fast[i] is None or ema_slow[i] is None:
-            macd_line.append(None)
-        else:
-            macd_line.append(ema_fast[i] - ema_slow[i])
-    
-    # Calculate signal line (EMA of MACD)
-    macd_values = [x for x in macd_line if x is not None]
-    if len(macd_values) >= signal:
-        signal_line = [None] * (len(macd_line) - len(macd_values))
-        signal_ema = calculate_ema(macd_values, signal)
-        signal_line.extend(signal_ema)
-    else:
-        signal_line = [None] * len(macd_line)
+    # Calculate signal line; the MACD line is defined from index slow - 1 on
+    signal_line = np.full_like(macd_line, np.nan)
+    signal_line[slow-1:] = calculate_ema(macd_line[slow-1:], signal)
     
-    # Calculate histogram
-    histogram = []
-    for i in range(len(macd_line)):
-        if macd_line[i] is None or signal_line[i] is None:
-            histogram.append(None)
-        else:
-            histogram.append(macd_line[i] - signal_line[i])
+    # Calculate histogram (NaN wherever either line is undefined)
+    histogram = macd_line - signal_line
     
     return macd_line, signal_line, histogram
 
 def process_stock_data(data):
     """
-    Process raw stock data for visualization with technical indicators
+    Process raw stock data, reusing the result computed for the same symbol
+    and refresh time
     """
-    if 'Time Series (Daily)' in data:
-        time_series = data['Time Series (Daily)']
-        
-        dates = []
-        prices = []
-        volumes = []
-        highs = []
-        lows = []
-        opens = []
-        
-        # Get the last 60 days of data for better indicator calculation
-        sorted_dates = sorted(time_series.keys(), reverse=True)[:60]
-        sorted_dates.reverse()  # Reverse to get chronological order
-        
-        for date in sorted_dates:
-            dates.append(date)
-            prices.append(float(time_series[date]['4. close']))
-            volumes.append(int(time_series[date]['5. volume']))
-            highs.append(float(time_series[date]['2. high']))
-            lows.append(float(time_series[date]['3. low']))
-            opens.append(float(time_series[date]['1. open']))
-        
-        # Calculate technical indicators
-        sma_20 = calculate_sma(prices, 20)
-        sma_50 = calculate_sma(prices, 50)
-        ema_12 = calculate_ema(prices, 12)
-        ema_26 = calculate_ema(prices, 26)
-        rsi = calculate_rsi(prices, 14)
-        bb_upper, bb_middle, bb_lower = calculate_bollinger_bands(prices, 20, 2)
-        macd_line, macd_signal, macd_histogram = calculate_macd(prices, 12, 26, 9)
-        
-        # Return last 30 days for display
-        display_length = min(30, len(dates))
-        start_index = len(dates) - display_length
-        
-        return {
-            'dates': dates[start_index:],
-            'prices': prices[start_index:],
-            'volumes': volumes[start_index:],
-            'highs': highs[start_index:],
-            'lows': lows[start_index:],
-            'opens': opens[start_index:],
-            'indicators': {
-                'sma_20': sma_20[start_index:],
-                'sma_50': sma_50[start_index:],
-                'ema_12': ema_12[start_index:],
-                'ema_26': ema_26[start_index:],
-                'rsi': rsi[start_index:],
-                'bollinger_upper': bb_upper[start_index:],
-                'bollinger_middle': bb_middle[start_index:],
-                'bollinger_lower': bb_lower[start_index:],
-                'macd_line': macd_line[start_index:],
-                'macd_signal': macd_signal[start_index:],
-                'macd_histogram': macd_histogram[start_index:]
-            },
-            'symbol': data['Meta Data']['2. Symbol'],
-            'last_refreshed': data['Meta Data']['3. Last Refreshed']
-        }
+    if 'Time Series (Daily)' not in data:
+        return None
     
-    return None
+    key = (data['Meta Data']['2. Symbol'], data['Meta Data']['3. Last Refreshed'])
+    result = processed_cache.get(key)
+    if result is None:
+        result = build_stock_data(data)
+        with processed_cache_lock:
+            processed_cache[key] = result
+            if len(processed_cache) > PROCESSED_CACHE_SIZE:
+                # Dicts keep insertion order, so this evicts the oldest entry
+                processed_cache.pop(next(iter(processed_cache)))
+    return result
+
+def build_stock_data(data):
+    """
+    Process raw stock data for visualization with technical indicators.
+    process_stock_data has already checked that the daily series is present.
+    """
+    time_series = data['Time Series (Daily)']
+    
+    # Get enough history for every indicator to cover the displayed days
+    # Alpha Vantage lists dates newest first and dict order is preserved, so
+    # the leading keys are the most recent; fall back to a heap otherwise
+    dates = list(itertools.islice(time_series, HISTORY_DAYS))
+    if any(newer <= older for newer, older in zip(dates, dates[1:])):
+        dates = heapq.nlargest(HISTORY_DAYS, time_series.keys())
+    dates.reverse()  # Reverse to get chronological order
+    
+    # Fill one preallocated array per field (structure of arrays). Prices
+    # stay float64 so the displayed quotes keep their cents at any price.
+    n = len(dates)
+    prices = np.empty(n, dtype=np.float64)
+    volumes = np.empty(n, dtype=np.int64)
+    highs = np.empty(n, dtype=np.float64)
+    lows = np.empty(n, dtype=np.float64)
+    opens = np.empty(n, dtype=np.float64)
+    
+    for i, date in enumerate(dates):
+        entry = time_series[date]
+        prices[i] = float(entry['4. close'])
+        volumes[i] = int(entry['5. volume'])
+        highs[i] = float(entry['2. high'])
+        lows[i] = float(entry['3. low'])
+        opens[i] = float(entry['1. open'])
+    
+    # Calculate technical indicators
+    if n < SHORTEST_WINDOW:
+        # No indicator has a defined value yet; skip the computation
+        indicators = (nan_series(n),) * 11
+    elif HAVE_NUMBA:
+        indicators = compute_all_indicators(
+            prices.astype(np.float32), SMA_SHORT_WINDOW, SMA_LONG_WINDOW,
+            EMA_FAST_WINDOW, EMA_SLOW_WINDOW, RSI_WINDOW, BOLLINGER_STD,
+            MACD_SIGNAL_WINDOW)
+    else:
+        indicators = (
+            calculate_sma(prices, SMA_SHORT_WINDOW),
+            calculate_sma(prices, SMA_LONG_WINDOW),
+            calculate_ema(prices, EMA_FAST_WINDOW),
+            calculate_ema(prices, EMA_SLOW_WINDOW),
+            calculate_rsi(prices, RSI_WINDOW),
+            *calculate_bollinger_bands(prices, SMA_SHORT_WINDOW, BOLLINGER_STD),
+            *calculate_macd(prices, EMA_FAST_WINDOW, EMA_SLOW_WINDOW,
+                            MACD_SIGNAL_WINDOW)
+        )
+    
+    # Indicators are only plotted, so emit them all as float32 to halve their
+    # share of the payload (the NumPy fallback computes some in float64)
+    (sma_20, sma_50, ema_12, ema_26, rsi, bb_upper, bb_middle, bb_lower,
+     macd_line, macd_signal, macd_histogram) = (
+        np.asarray(series, dtype=np.float32) for series in indicators)
+    
+    # Return the last DISPLAY_DAYS days for display
+    display_length = min(DISPLAY_DAYS, len(dates))
+    start_index = len(dates) - display_length
+    
+    return {
+        'dates': dates[start_index:],
+        'prices': prices[start_index:],
+        'volumes': volumes[start_index:],
+        'highs': highs[start_index:],
+        'lows': lows[start_index:],
+        'opens': opens[start_index:],
+        'indicators': {
+            'sma_20': sma_20[start_index:],
+            'sma_50': sma_50[start_index:],
+            'ema_12': ema_12[start_index:],
+            'ema_26': ema_26[start_index:],
+            'rsi': rsi[start_index:],
+            'bollinger_upper': bb_upper[start_index:],
+            'bollinger_middle': bb_middle[start_index:],
+            'bollinger_lower': bb_lower[start_index:],
+            'macd_line': macd_line[start_index:],
+            'macd_signal': macd_signal[start_index:],
+            'macd_histogram': macd_histogram[start_index:]
+        },
+        'symbol': data['Meta Data']['2. Symbol'],
+        'last_refreshed': data['Meta Data']['3. Last Refreshed']
+    }
 
 def get_company_info(symbol):
     """
     Get company overview information
     """
-    params = {
-        'function': 'OVERVIEW',
-        'symbol': symbol,
-        'apikey': API_KEY
-    }
-    
     try:
-        response = requests.get(BASE_URL, params=params)
-        data = response.json()
+        data = _cached_query('OVERVIEW', symbol, cache_bucket())
         
         if 'Symbol' in data:
             return {
@@ -236,6 +352,50 @@ def get_company_info(symbol):
     
     return None
 
+def iter_json(obj):
+    """
+    Yield the JSON encoding of obj in pieces, one chunk per dict entry, so the
+    client receives the start of the payload before all arrays are serialized
+    """
+    if isinstance(obj, dict):
+        prefix = b'{'
+        for key, value in obj.items():
+            prefix += orjson.dumps(key) + b':'
+            if isinstance(value, dict):
+                yield prefix
+                yield from iter_json(value)
+            else:
+                # NumPy arrays are serialized directly; NaN padding becomes null
+                yield prefix + orjson.dumps(value, option=orjson.OPT_SERIALIZE_NUMPY)
+            prefix = b','
+        yield b'{}' if prefix == b'{' else b'}'
+    else:
+        yield orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+def gzip_chunks(chunks):
+    """
+    Gzip-compress a stream of byte chunks incrementally. Each chunk is
+    sync-flushed so its compressed bytes go out immediately instead of
+    sitting in the compressor until the end of the body.
+    """
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+def json_response(payload):
+    """
+    Stream a payload as JSON, gzip-compressed when the client accepts it
+    """
+    chunks = iter_json(payload)
+    headers = {'Vary': 'Accept-Encoding'}
+    if request.accept_encodings['gzip'] > 0:
+        chunks = gzip_chunks(chunks)
+        headers['Content-Encoding'] = 'gzip'
+    
+    return Response(stream_with_context(chunks), mimetype='application/json',
+                    headers=headers)
+
 @app.route('/')
 def index():
     """
@@ -248,10 +408,16 @@ def get_stock(symbol):
     """
     API endpoint to get stock data
     """
-    # Get daily stock data
-    stock_data, error = get_stock_data(symbol.upper())
+    symbol = symbol.upper()
+    
+    # Fetch daily stock data and company information concurrently
+    stock_future = executor.submit(get_stock_data, symbol)
+    company_future = executor.submit(get_company_info, symbol)
+    stock_data, error = stock_future.result()
     
     if error:
+        # Skip the overview lookup if it hasn't started yet
+        company_future.cancel()
         return jsonify({'error': error}), 400
     
     processed_data = process_stock_data(stock_data)
@@ -259,15 +425,14 @@ def get_stock(symbol):
     if not processed_data:
         return jsonify({'error': 'Failed to process stock data'}), 400
     
-    # Get company information
-    company_info = get_company_info(symbol.upper())
+    company_info = company_future.result()
     
     response_data = {
         'stock_data': processed_data,
         'company_info': company_info
     }
     
-    return jsonify(response_data)
+    return json_response(response_data)
 
 @app.route('/stock/<symbol>')
 def stock_detail(symbol):
@@ -277,4 +442,6 @@ def stock_detail(symbol):
     return render_template('stock.html', symbol=symbol.upper())
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    # Development server only; production runs under gunicorn (see wsgi.py)
+    debug = os.getenv('FLASK_DEBUG', 'False').lower() in ('1', 'true')
+    app.run(debug=debug, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,148 @@
+import numpy as np
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        """Fallback when numba is not installed: run kernels as plain Python"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        
+        def decorator(func):
+            return func
+        return decorator
+
+
+# An explicit signature makes numba compile (or load from its disk cache) at
+# import time instead of on the first call. Series are stored as float32,
+# which is ample for charting; running state is kept in float64 scalars.
+@njit('UniTuple(f4[:], 11)(f4[:], i8, i8, i8, i8, i8, f8, i8)', cache=True, nogil=True)
+def _indicators_loop(x, sma_short, sma_long, ema_fast, ema_slow, rsi_window, num_std, signal):
+    """Single-pass kernel behind compute_all_indicators"""
+    n = x.shape[0]
+    sma_s = np.full(n, np.nan, dtype=np.float32)
+    sma_l = np.full(n, np.nan, dtype=np.float32)
+    ema_f = np.full(n, np.nan, dtype=np.float32)
+    ema_s = np.full(n, np.nan, dtype=np.float32)
+    rsi = np.full(n, np.nan, dtype=np.float32)
+    bb_upper = np.full(n, np.nan, dtype=np.float32)
+    bb_lower = np.full(n, np.nan, dtype=np.float32)
+    macd = np.full(n, np.nan, dtype=np.float32)
+    macd_signal = np.full(n, np.nan, dtype=np.float32)
+    macd_hist = np.full(n, np.nan, dtype=np.float32)
+    
+    sum_s = 0.0
+    sum_sq_s = 0.0
+    sum_l = 0.0
+    k_f = 2.0 / (ema_fast + 1)
+    k_s = 2.0 / (ema_slow + 1)
+    k_sig = 2.0 / (signal + 1)
+    ema_f_val = 0.0
+    ema_s_val = 0.0
+    signal_val = 0.0
+    gain = 0.0
+    loss = 0.0
+    
+    for i in range(n):
+        p = float(x[i])
+        
+        # SMAs and Bollinger Bands from running sums
+        sum_s += p
+        sum_sq_s += p * p
+        if i >= sma_short:
+            q = float(x[i-sma_short])
+            sum_s -= q
+            sum_sq_s -= q * q
+        if i >= sma_short - 1:
+            mean = sum_s / sma_short
+            std_dev = np.sqrt(max(sum_sq_s / sma_short - mean * mean, 0.0))
+            sma_s[i] = mean
+            bb_upper[i] = mean + num_std * std_dev
+            bb_lower[i] = mean - num_std * std_dev
+        
+        sum_l += p
+        if i >= sma_long:
+            sum_l -= float(x[i-sma_long])
+        if i >= sma_long - 1:
+            sma_l[i] = sum_l / sma_long
+        
+        # EMAs, seeded with the SMA of their first window (the seed sum is
+        # accumulated in the EMA value itself until the window is full)
+        if i < ema_fast:
+            ema_f_val += p
+            if i == ema_fast - 1:
+                ema_f_val /= ema_fast
+                ema_f[i] = ema_f_val
+        else:
+            ema_f_val = p * k_f + ema_f_val * (1.0 - k_f)
+            ema_f[i] = ema_f_val
+        
+        if i < ema_slow:
+            ema_s_val += p
+            if i == ema_slow - 1:
+                ema_s_val /= ema_slow
+                ema_s[i] = ema_s_val
+        else:
+            ema_s_val = p * k_s + ema_s_val * (1.0 - k_s)
+            ema_s[i] = ema_s_val
+        
+        # MACD and its signal EMA, defined once the slow EMA is
+        j = i - (ema_slow - 1)
+        if j >= 0:
+            macd_val = ema_f_val - ema_s_val
+            macd[i] = macd_val
+            if j < signal:
+                signal_val += macd_val
+                if j == signal - 1:
+                    signal_val /= signal
+                    macd_signal[i] = signal_val
+                    macd_hist[i] = macd_val - signal_val
+            else:
+                signal_val = macd_val * k_sig + signal_val * (1.0 - k_sig)
+                macd_signal[i] = signal_val
+                macd_hist[i] = macd_val - signal_val
+        
+        # Wilder RSI; the seed average itself is not emitted
+        if i >= 1:
+            d = p - float(x[i-1])
+            g = d if d > 0 else 0.0
+            l = -d if d < 0 else 0.0
+            if i <= rsi_window:
+                gain += g
+                loss += l
+                if i == rsi_window:
+                    gain /= rsi_window
+                    loss /= rsi_window
+            else:
+                gain = (gain * (rsi_window - 1) + g) / rsi_window
+                loss = (loss * (rsi_window - 1) + l) / rsi_window
+                rsi[i] = 100.0 if loss == 0 else 100.0 - 100.0 / (1.0 + gain / loss)
+    
+    return (sma_s, sma_l, ema_f, ema_s, rsi, bb_upper, sma_s, bb_lower,
+            macd, macd_signal, macd_hist)
+
+
+def compute_all_indicators(x, sma_short, sma_long, ema_fast, ema_slow, rsi_window,
+                           num_std, signal):
+    """
+    Compute every chart indicator in a single pass over a float32 price array.
+    
+    Returns (sma_short, sma_long, ema_fast, ema_slow, rsi, bb_upper, bb_middle,
+    bb_lower, macd_line, macd_signal, macd_histogram), each NaN-padded to the
+    length of x. Bollinger Bands share the short SMA window, and MACD reuses the
+    fast/slow EMAs.
+    """
+    return _indicators_loop(x, sma_short, sma_long, ema_fast, ema_slow,
+                            rsi_window, float(num_std), signal)
+
+
+def warm_up():
+    """Run every kernel once so the first request hits fully initialized code"""
+    x = np.zeros(64, dtype=np.float32)
+    compute_all_indicators(x, 20, 50, 12, 26, 14, 2.0, 9)
+
+
+warm_up()
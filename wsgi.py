@@ -0,0 +1,10 @@
+"""
+WSGI entry point for production servers, e.g.
+
+    gunicorn -k gthread --threads 8 --workers $(nproc) -b 0.0.0.0:5000 wsgi
+"""
+from app import app
+
+# Never serve the interactive debugger in production, whatever .env says
+app.debug = False
+application = app